@@ -6,77 +6,16 @@ Supports both stdio and SSE server configurations
 
 import json
 import base64
-import urllib.parse
+import orjson
+from urllib.parse import quote_plus
+from functools import lru_cache
 from typing import Dict, Any, Optional
 import webbrowser
 import argparse
 
-class LMStudioMCPInstaller:
-    """Generate installation deeplinks for LM Studio MCP servers"""
-    
-    def __init__(self):
-        self.deeplink_base = "lmstudio://add_mcp"
-        
-    def create_stdio_config(
-        self,
-        command: str,
-        script_path: str,
-        env_vars: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
-        """Create configuration for stdio-based MCP server"""
-        config = {
-            "command": command,
-            "args": [script_path]
-        }
-        
-        if env_vars:
-            config["env"] = env_vars
-            
-        return config
-    
-    def create_sse_config(
-        self,
-        url: str,
-        headers: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
-        """Create configuration for SSE-based MCP server"""
-        config = {"url": url}
-        
-        if headers:
-            config["headers"] = headers
-            
-        return config
-    
-    def generate_deeplink(self, server_name: str, config: Dict[str, Any]) -> str:
-        """Generate the deeplink URL for one-click installation"""
-        
-        # Convert config to JSON and encode to base64
-        config_json = json.dumps(config)
-        config_base64 = base64.b64encode(config_json.encode()).decode()
-        
-        # Build the deeplink
-        params = {
-            "name": server_name,
-            "config": config_base64
-        }
-        
-        query_string = urllib.parse.urlencode(params)
-        deeplink = f"{self.deeplink_base}?{query_string}"
-        
-        return deeplink
-    
-    def generate_html_installer(
-        self,
-        server_name: str,
-        config: Dict[str, Any],
-        description: str = "",
-        output_file: str = "installer.html"
-    ):
-        """Generate a standalone HTML installer page"""
-        
-        deeplink = self.generate_deeplink(server_name, config)
-        
-        html_content = f"""<!DOCTYPE html>
+# Installer page template, built once at import time. CSS braces are
+# doubled so str.format_map only touches the named placeholders.
+_HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <title>Install {server_name} - LM Studio MCP</title>
@@ -147,27 +86,105 @@ class LMStudioMCPInstaller:
 <body>
     <div class="card">
         <h1>🚀 {server_name}</h1>
-        <p class="description">{description or 'MCP Server for LM Studio'}</p>
-        
+        <p class="description">{description}</p>
+
         <a href="{deeplink}" class="install-btn">
             Install in LM Studio
         </a>
-        
+
         <div class="config">
             <strong>Configuration:</strong>
-            <pre>{json.dumps(config, indent=2)}</pre>
+            <pre>{config_pretty}</pre>
         </div>
-        
+
         <div class="warning">
             ⚠️ Only install MCP servers from trusted sources
         </div>
     </div>
 </body>
 </html>"""
+
+# Static part of every deeplink, prebuilt as bytes
+_DEEPLINK_PREFIX = b"lmstudio://add_mcp?name="
+
+@lru_cache(maxsize=32)
+def _encode_config(config_json: bytes) -> bytes:
+    """Base64-encode canonical config JSON bytes (memoized per config).
+
+    Uses url-safe base64 with the padding stripped, so the result can be
+    dropped into a query string without any percent-encoding. LM Studio's
+    deeplink handler accepts this (b64decode restores padding).
+    """
+    return base64.urlsafe_b64encode(config_json).rstrip(b"=")
+
+class LMStudioMCPInstaller:
+    """Generate installation deeplinks for LM Studio MCP servers"""
+    
+    def __init__(self):
+        self.deeplink_base = "lmstudio://add_mcp"
+        
+    def create_stdio_config(
+        self,
+        command: str,
+        script_path: str,
+        env_vars: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Create configuration for stdio-based MCP server"""
+        config = {
+            "command": command,
+            "args": [script_path]
+        }
+        
+        if env_vars:
+            config["env"] = env_vars
+            
+        return config
+    
+    def create_sse_config(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Create configuration for SSE-based MCP server"""
+        config = {"url": url}
         
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        if headers:
+            config["headers"] = headers
+            
+        return config
+    
+    def generate_deeplink(self, server_name: str, config: Dict[str, Any]) -> str:
+        """Generate the deeplink URL for one-click installation"""
         
+        # Single bytes pipeline: orjson emits canonical JSON bytes (sorted
+        # keys so identical configs share a cache entry), url-safe base64
+        # stays bytes, and one concatenation builds the final URL.
+        config_base64 = _encode_config(orjson.dumps(config, option=orjson.OPT_SORT_KEYS))
+        return (_DEEPLINK_PREFIX + quote_plus(server_name).encode("ascii")
+                + b"&config=" + config_base64).decode("ascii")
+    
+    def generate_html_installer(
+        self,
+        server_name: str,
+        config: Dict[str, Any],
+        description: str = "",
+        output_file: str = "installer.html"
+    ):
+        """Generate a standalone HTML installer page"""
+
+        deeplink = self.generate_deeplink(server_name, config)
+
+        html_content = _HTML_TEMPLATE.format_map({
+            "server_name": server_name,
+            "description": description or "MCP Server for LM Studio",
+            "deeplink": deeplink,
+            "config_pretty": orjson.dumps(config, option=orjson.OPT_INDENT_2).decode()
+        })
+
+        # Binary mode: one encode, no newline translation on Windows
+        with open(output_file, 'wb') as f:
+            f.write(html_content.encode("utf-8"))
+
         print(f"✅ HTML installer saved to: {output_file}")
         return output_file
 
@@ -205,6 +222,11 @@ PRESETS = {
     }
 }
 
+# Pre-compute preset deeplinks at import time so the --preset path is a lookup
+_preset_installer = LMStudioMCPInstaller()
+for _preset in PRESETS.values():
+    _preset["_deeplink"] = _preset_installer.generate_deeplink(_preset["name"], _preset["config"])
+
 def main():
     parser = argparse.ArgumentParser(description="Generate LM Studio MCP installer")
     parser.add_argument("--preset", choices=list(PRESETS.keys()), help="Use a preset configuration")
@@ -244,8 +266,11 @@ def main():
         description = "Custom MCP server"
     
     if args.print_link:
-        # Just print the deeplink
-        deeplink = installer.generate_deeplink(server_name, config)
+        # Just print the deeplink (presets are pre-computed at import time)
+        if args.preset:
+            deeplink = PRESETS[args.preset]["_deeplink"]
+        else:
+            deeplink = installer.generate_deeplink(server_name, config)
         print(f"Deeplink: {deeplink}")
     else:
         # Generate HTML installer
@@ -2,46 +2,136 @@
 from mcp.server.fastmcp import FastMCP
 import aiohttp
 import asyncio
-import json
+import logging
 import sys
+import time
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 
+# Fast JSON backend: prefer orjson, fall back to ujson, then stdlib.
+# All three are wrapped to the same bytes-out surface so call sites
+# decode exactly once at the aiohttp boundary.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to compact JSON bytes"""
+        return orjson.dumps(obj)
+
+    def _dumps_indent(obj: Any) -> bytes:
+        """Serialize to pretty-printed JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    try:
+        import ujson
+
+        _loads = ujson.loads
+
+        def _dumps(obj: Any) -> bytes:
+            """Serialize to compact JSON bytes"""
+            return ujson.dumps(obj).encode()
+
+        def _dumps_indent(obj: Any) -> bytes:
+            """Serialize to pretty-printed JSON bytes"""
+            return ujson.dumps(obj, indent=2).encode()
+    except ImportError:
+        import json
+
+        _loads = json.loads
+
+        def _dumps(obj: Any) -> bytes:
+            """Serialize to compact JSON bytes"""
+            return json.dumps(obj, separators=(",", ":")).encode()
+
+        def _dumps_indent(obj: Any) -> bytes:
+            """Serialize to pretty-printed JSON bytes"""
+            return json.dumps(obj, indent=2).encode()
+
+async def _prewarm():
+    """Open the connection pool early so the first tool call skips DNS/TCP setup"""
+    try:
+        session = await get_session()
+        async with session.get(_URL_MODELS):
+            pass
+    except Exception:
+        pass  # best-effort warmup only
+
+# Keep a reference so the warmup task isn't garbage-collected mid-flight
+_prewarm_task: Optional["asyncio.Task"] = None
+
+@asynccontextmanager
+async def _lifespan(_server):
+    """Server lifespan: prewarm on startup, close the session on shutdown"""
+    global _prewarm_task
+    _prewarm_task = asyncio.create_task(_prewarm())
+    try:
+        yield
+    finally:
+        # Tear down inside the server's own loop; running cleanup from
+        # atexit via asyncio.run targets a fresh loop and can raise
+        # "Event loop is closed" while leaking the connector.
+        _prewarm_task.cancel()
+        await cleanup_session()
+
 # Initialize FastMCP server
-mcp = FastMCP("lmstudio-bridge")
+mcp = FastMCP("lmstudio-bridge", lifespan=_lifespan)
 
 # LM Studio settings - configurable via environment variable
 import os
 LMSTUDIO_API_BASE = os.getenv("LMSTUDIO_API_BASE", "http://192.168.50.136:1234/v1")
 DEFAULT_MODEL = "default"  # Will be replaced with whatever model is currently loaded
 
-# Global session for connection pooling
+# Endpoint URLs, built once instead of per request
+_URL_MODELS = f"{LMSTUDIO_API_BASE}/models"
+_URL_CHAT = f"{LMSTUDIO_API_BASE}/chat/completions"
+
+# Global session and connector for connection pooling. The connector is
+# kept separate so a rebuilt session (e.g. after a transient close) reuses
+# the existing DNS cache and socket pools.
+_connector: Optional[aiohttp.TCPConnector] = None
 _session: Optional[aiohttp.ClientSession] = None
 
+# (timestamp, model id) cache for get_current_model so repeated calls
+# don't hammer the /models endpoint
+_CURRENT_MODEL_TTL = 30  # seconds
+_current_model_cache: tuple = (0.0, "")
+
 async def get_session() -> aiohttp.ClientSession:
     """Get or create aiohttp session with connection pooling"""
-    global _session
-    if _session is None or _session.closed:
-        connector = aiohttp.TCPConnector(
+    global _connector, _session
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(
             limit=100,  # Total connection limit
             limit_per_host=20,  # Per-host connection limit
             keepalive_timeout=30,
             enable_cleanup_closed=True
         )
+    if _session is None or _session.closed:
         timeout = aiohttp.ClientTimeout(total=300, connect=10)
         _session = aiohttp.ClientSession(
-            connector=connector,
+            connector=_connector,
+            connector_owner=False,
             timeout=timeout,
-            headers={"Content-Type": "application/json"}
+            headers={
+                "Content-Type": "application/json",
+                # Ask for compressed responses; aiohttp auto-decompresses.
+                # No-op if LM Studio's server doesn't honor it.
+                "Accept-Encoding": "gzip, deflate"
+            },
+            json_serialize=lambda obj: _dumps(obj).decode()
         )
     return _session
 
-def log_error(message: str):
-    """Log error messages to stderr for debugging"""
-    print(f"ERROR: {message}", file=sys.stderr)
-
-def log_info(message: str):
-    """Log informational messages to stderr for debugging"""
-    print(f"INFO: {message}", file=sys.stderr)
+# Log to stderr (stdout carries the MCP stdio transport). WARNING by
+# default so INFO-level formatting and writes are skipped on hot paths;
+# set LMSTUDIO_BRIDGE_DEBUG=1 to see the informational messages.
+logger = logging.getLogger("lmstudio_bridge")
+_handler = logging.StreamHandler(sys.stderr)
+_handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+logger.addHandler(_handler)
+logger.setLevel(logging.INFO if os.getenv("LMSTUDIO_BRIDGE_DEBUG") else logging.WARNING)
 
 @mcp.tool()
 async def health_check() -> str:
@@ -52,11 +142,17 @@ async def health_check() -> str:
     """
     try:
         session = await get_session()
-        async with session.get(f"{LMSTUDIO_API_BASE}/models") as response:
-            if response.status == 200:
-                return "LM Studio API is running and accessible."
-            else:
-                return f"LM Studio API returned status code {response.status}."
+        # HEAD avoids transferring the whole model list just for a status
+        # code; fall back to GET if the server doesn't support it
+        async with session.head(_URL_MODELS) as response:
+            status = response.status
+        if status in (405, 501):
+            async with session.get(_URL_MODELS) as response:
+                status = response.status
+        if status == 200:
+            return "LM Studio API is running and accessible."
+        else:
+            return f"LM Studio API returned status code {status}."
     except Exception as e:
         return f"Error connecting to LM Studio API: {str(e)}"
 
@@ -69,48 +165,51 @@ async def list_models() -> str:
     """
     try:
         session = await get_session()
-        async with session.get(f"{LMSTUDIO_API_BASE}/models") as response:
+        async with session.get(_URL_MODELS) as response:
             if response.status != 200:
                 return f"Failed to fetch models. Status code: {response.status}"
             
-            data = await response.json()
+            data = _loads(await response.read())
             models = data.get("data", [])
             if not models:
                 return "No models found in LM Studio."
             
-            result = "Available models in LM Studio:\n\n"
-            for model in models:
-                result += f"- {model['id']}\n"
-            
-            return result
+            lines = [f"- {model['id']}" for model in models]
+            return "Available models in LM Studio:\n\n" + "\n".join(lines) + "\n"
     except Exception as e:
-        log_error(f"Error in list_models: {str(e)}")
+        logger.error(f"Error in list_models: {str(e)}")
         return f"Error listing models: {str(e)}"
 
 @mcp.tool()
 async def get_current_model() -> str:
     """Get the currently loaded model in LM Studio.
-    
+
     Returns:
         The name of the currently loaded model.
     """
+    global _current_model_cache
     try:
+        # Asking the model to identify itself costs a full inference pass
+        # and often hallucinates; /models reports the loaded model first.
+        ts, cached = _current_model_cache
+        if cached and time.monotonic() - ts < _CURRENT_MODEL_TTL:
+            return f"Currently loaded model: {cached}"
+
         session = await get_session()
-        payload = {
-            "messages": [{"role": "system", "content": "What model are you?"}],
-            "temperature": 0.7,
-            "max_tokens": 10
-        }
-        
-        async with session.post(f"{LMSTUDIO_API_BASE}/chat/completions", json=payload) as response:
+        async with session.get(_URL_MODELS) as response:
             if response.status != 200:
                 return f"Failed to identify current model. Status code: {response.status}"
-            
-            data = await response.json()
-            model_info = data.get("model", "Unknown")
+
+            data = _loads(await response.read())
+            models = data.get("data", [])
+            if not models:
+                return "No model is currently loaded in LM Studio."
+
+            model_info = models[0].get("id", "Unknown")
+            _current_model_cache = (time.monotonic(), model_info)
             return f"Currently loaded model: {model_info}"
     except Exception as e:
-        log_error(f"Error in get_current_model: {str(e)}")
+        logger.error(f"Error in get_current_model: {str(e)}")
         return f"Error identifying current model: {str(e)}"
 
 @mcp.tool()
@@ -137,7 +236,7 @@ async def chat_completion(prompt: str, system_prompt: str = "", temperature: flo
         # Add user message
         messages.append({"role": "user", "content": prompt})
         
-        log_info(f"Sending async request to LM Studio with {len(messages)} messages, model: {model or 'default'}")
+        logger.info("Sending async request to LM Studio with %d messages, model: %s", len(messages), model or "default")
         
         payload = {
             "messages": messages,
@@ -150,14 +249,14 @@ async def chat_completion(prompt: str, system_prompt: str = "", temperature: flo
             payload["model"] = model
         
         session = await get_session()
-        async with session.post(f"{LMSTUDIO_API_BASE}/chat/completions", json=payload) as response:
+        async with session.post(_URL_CHAT, json=payload) as response:
             if response.status != 200:
                 error_text = await response.text()
-                log_error(f"LM Studio API error: {response.status}")
+                logger.error(f"LM Studio API error: {response.status}")
                 return f"Error: LM Studio returned status code {response.status}: {error_text[:200]}"
             
-            response_json = await response.json()
-            log_info(f"Received async response from LM Studio")
+            response_json = _loads(await response.read())
+            logger.info("Received async response from LM Studio")
             
             # Extract the assistant's message
             choices = response_json.get("choices", [])
@@ -173,7 +272,7 @@ async def chat_completion(prompt: str, system_prompt: str = "", temperature: flo
             return content
             
     except Exception as e:
-        log_error(f"Error in chat_completion: {str(e)}")
+        logger.error(f"Error in chat_completion: {str(e)}")
         return f"Error generating completion: {str(e)}"
 
 @mcp.tool()
@@ -192,9 +291,9 @@ async def multi_agent_query(prompt: str, models: List[str], system_prompt: str =
     """
     try:
         if not models:
-            return json.dumps({"error": "No models specified"})
+            return _dumps_indent({"error": "No models specified"}).decode()
         
-        log_info(f"Sending concurrent requests to {len(models)} models")
+        logger.info("Sending concurrent requests to %d models", len(models))
         
         # Create async tasks for true concurrent execution
         session = await get_session()
@@ -203,20 +302,26 @@ async def multi_agent_query(prompt: str, models: List[str], system_prompt: str =
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
-        
+
+        # Serialize the shared payload once; each task just splices in its
+        # model id instead of re-encoding the (potentially large) messages.
+        base_body = _dumps({
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })[:-1]  # strip closing brace so the model field can be appended
+
         async def query_single_model(model: str) -> tuple:
             """Query a single model and return (model, result)"""
             try:
-                payload = {
-                    "model": model,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                }
-                
-                async with session.post(f"{LMSTUDIO_API_BASE}/chat/completions", json=payload) as response:
+                body = base_body + b',"model":' + _dumps(model) + b"}"
+
+                async with session.post(_URL_CHAT, data=body) as response:
+                    # Read the body once and branch on status; .text() would
+                    # re-buffer and run charset detection on the error path
+                    raw = await response.read()
                     if response.status == 200:
-                        data = await response.json()
+                        data = _loads(raw)
                         content = data["choices"][0]["message"]["content"]
                         return model, {
                             "success": True,
@@ -224,10 +329,9 @@ async def multi_agent_query(prompt: str, models: List[str], system_prompt: str =
                             "tokens": data.get("usage", {}).get("total_tokens", 0)
                         }
                     else:
-                        error_text = await response.text()
                         return model, {
                             "success": False,
-                            "error": f"HTTP {response.status}: {error_text[:200]}"
+                            "error": f"HTTP {response.status}: {raw[:200].decode('utf-8', 'replace')}"
                         }
             except Exception as e:
                 return model, {
@@ -235,43 +339,39 @@ async def multi_agent_query(prompt: str, models: List[str], system_prompt: str =
                     "error": str(e)
                 }
         
-        # Execute all requests concurrently using asyncio.gather
+        # Execute all requests concurrently, collecting each result as it
+        # arrives instead of waiting on the slowest model
+        # query_single_model catches its own exceptions and always returns
+        # a (model, result) tuple, so no per-task wrapping is needed; the
+        # enclosing try/except still guards against genuine bugs.
         tasks = [query_single_model(model) for model in models]
-        task_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
         results = {}
-        for task_result in task_results:
-            if isinstance(task_result, Exception):
-                results["unknown"] = {
-                    "success": False,
-                    "error": str(task_result)
-                }
-            else:
-                model, result = task_result
-                results[model] = result
+        for coro in asyncio.as_completed(tasks):
+            model, result = await coro
+            results[model] = result
         
-        log_info(f"Completed concurrent requests, {len([r for r in results.values() if r.get('success')])} successful")
-        return json.dumps(results, indent=2)
+        if logger.isEnabledFor(logging.INFO):
+            successes = sum(1 for r in results.values() if r.get("success"))
+            logger.info("Completed concurrent requests, %d successful", successes)
+        return _dumps_indent(results).decode()
         
     except Exception as e:
-        log_error(f"Error in multi_agent_query: {str(e)}")
-        return json.dumps({"error": f"Multi-agent query failed: {str(e)}"})
+        logger.error(f"Error in multi_agent_query: {str(e)}")
+        return _dumps_indent({"error": f"Multi-agent query failed: {str(e)}"}).decode()
 
 async def cleanup_session():
-    """Clean up the aiohttp session"""
+    """Clean up the aiohttp session and connector"""
     global _session
     if _session and not _session.closed:
         await _session.close()
+    if _connector and not _connector.closed:
+        await _connector.close()
 
 def main():
     """Entry point for the package when installed via pip"""
-    import atexit
-    
-    # Register cleanup function
-    atexit.register(lambda: asyncio.run(cleanup_session()) if _session else None)
-    
-    log_info("Starting LM Studio Bridge MCP Server with async support")
+    # Session/connector cleanup happens in _lifespan, inside the server's
+    # own event loop.
+    logger.info("Starting LM Studio Bridge MCP Server with async support")
     mcp.run(transport='stdio')
 
 if __name__ == "__main__":